@@ -3,16 +3,54 @@ AI Study Planner - Pure Python Version
 No web framework, just command line
 """
 
-from flask import Flask, render_template, request, redirect, url_for, session
+from flask import Flask, render_template, request, redirect, url_for, session, jsonify
+from flask.sessions import SecureCookieSessionInterface
 import google.generativeai as genai
+from google import genai as google_genai
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import orjson
 import os
+import logging
+from logging.handlers import RotatingFileHandler
+import copy
+import secrets
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from datetime import datetime
 
+class OrjsonSerializer:
+    """itsdangerous-compatible serializer backed by orjson"""
+
+    @staticmethod
+    def dumps(obj):
+        # Must return str: a bytes payload makes itsdangerous produce a bytes
+        # cookie value, which Werkzeug's set_cookie rejects
+        return orjson.dumps(obj).decode()
+
+    @staticmethod
+    def loads(data):
+        return orjson.loads(data)
+
+
+class OrjsonSessionInterface(SecureCookieSessionInterface):
+    """Signed-cookie sessions serialized with orjson instead of Flask's tagged JSON.
+
+    The session only holds plain strings (form fields and a plan id), so the
+    tagged serializer's support for tuples, bytes, Markup etc. isn't needed.
+    itsdangerous already zlib-compresses the payload when that makes it smaller.
+    """
+    serializer = OrjsonSerializer()
+
+
 app = Flask(__name__)
 app.secret_key = "students" 
+app.session_interface = OrjsonSessionInterface()
 
 # Site-wide name used in templates and meta
 app.config['SITE_NAME'] = "Exampill"
@@ -24,92 +62,375 @@ def inject_site_name():
 # Load environment variables from .env
 load_dotenv()
 
+# LOG_LEVEL controls verbosity (set WARNING in production to mute progress
+# messages); LOG_FILE switches from stderr to a rotating log file
+logger = logging.getLogger('exampill')
+log_level = os.getenv('LOG_LEVEL', 'INFO').upper()
+logger.setLevel(logging.getLevelNamesMapping().get(log_level, logging.INFO))
+if not logger.handlers:
+    log_file = os.getenv('LOG_FILE')
+    handler = RotatingFileHandler(log_file, maxBytes=5_000_000, backupCount=3) if log_file else logging.StreamHandler()
+    handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s'))
+    logger.addHandler(handler)
+if log_level not in logging.getLevelNamesMapping():
+    logger.warning('⚠️ Unknown LOG_LEVEL %r, using INFO', log_level)
+
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
 YOUTUBE_API_KEY = os.getenv('YOUTUBE_API_KEY')
 
+MODEL_NAME = 'gemini-2.5-flash-lite'
+
+# Shared preamble for every Gemini call, sent once as the model's system
+# instruction instead of being repeated in each prompt
+SYSTEM_INSTRUCTION = """You are an education expert helping students prepare for exams.
+Always answer with ONLY valid JSON in exactly the requested format, no markdown or extra text."""
+
+model = None
 if not GEMINI_API_KEY:
-    print("⚠️ GEMINI_API_KEY not set in environment (check .env)")
+    logger.warning("⚠️ GEMINI_API_KEY not set in environment (check .env)")
 else:
     try:
         genai.configure(api_key=GEMINI_API_KEY)
-        model = genai.GenerativeModel('gemini-2.5-flash-lite')
+        model = genai.GenerativeModel(MODEL_NAME, system_instruction=SYSTEM_INSTRUCTION)
     except Exception as e:
-        print(f"⚠️ Failed to configure Gemini client: {e}")
+        logger.warning("⚠️ Failed to configure Gemini client: %s", e)
+
+# Shared worker pool for the network-bound YouTube/Gemini calls
+executor = ThreadPoolExecutor(max_workers=8)
+
+# YouTube prefetch while a study plan streams in: only the first few topics,
+# because each search.list call costs 100 units of the 10k/day API quota.
+# Set YOUTUBE_PREFETCH_TOPICS=0 to turn it off. Prefetches get their own
+# small pool so they never queue ahead of searches a student is waiting on.
+PREFETCH_TOPICS = int(os.getenv('YOUTUBE_PREFETCH_TOPICS', '2'))
+prefetch_executor = ThreadPoolExecutor(max_workers=2)
+
+# Pooled HTTP session so YouTube calls reuse keep-alive TLS connections
+http = requests.Session()
+http.mount('https://', HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504]),
+))
+
+
+def warm_up_clients():
+    """Open the Gemini and YouTube connections before the first real request needs them"""
+    if model is not None:
+        try:
+            # count_tokens goes through the same client and auth as generate_content,
+            # but costs no generation
+            model.count_tokens('ping')
+        except Exception as e:
+            logger.debug('Gemini warm-up failed: %s', e)
+    try:
+        http.head('https://www.googleapis.com', timeout=(3, 10))
+    except Exception as e:
+        logger.debug('YouTube warm-up failed: %s', e)
 
 
-def call_model(prompt):
-    """Attempt multiple ways to call the installed GenAI client and return text or None."""
-    try:
-        # If the model object exposes generate_content (original code expectation)
-        if hasattr(model, 'generate_content'):
-            resp = model.generate_content(prompt)
-            text = getattr(resp, 'text', None)
-            if text is None and isinstance(resp, str):
-                text = resp
-            return text.strip() if isinstance(text, str) else None
-
-        # If the genai module exposes a generate(...) function returning dict/object
-        if hasattr(genai, 'generate'):
-            try:
-                resp = genai.generate(prompt=prompt)
-            except TypeError:
-                # older signatures might accept positional
-                resp = genai.generate(prompt)
+def start_warm_up():
+    """Warm up in the background so startup isn't delayed"""
+    threading.Thread(target=warm_up_clients, daemon=True).start()
 
-            if isinstance(resp, dict):
-                text = resp.get('text') or resp.get('content') or resp.get('output') or None
-            else:
-                text = getattr(resp, 'text', None)
-            return text.strip() if isinstance(text, str) else None
+# In-process cache for Gemini answers: identical requests within a day
+# (same exam details, same topic + videos) reuse the earlier response
+CACHE_TTL = 24 * 60 * 60
+CACHE_MAX_ENTRIES = 512
+_response_cache = {}
+_cache_lock = threading.Lock()
+
+
+def cache_get(key):
+    """Return a copy of the cached value for key, or None if missing/expired"""
+    with _cache_lock:
+        entry = _response_cache.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if time.time() - stored_at > CACHE_TTL:
+            del _response_cache[key]
+            return None
+    return copy.deepcopy(value)
+
+
+def cache_set(key, value):
+    """Store a copy of value under key, evicting the oldest entries when full"""
+    with _cache_lock:
+        _response_cache.pop(key, None)
+        _response_cache[key] = (time.time(), copy.deepcopy(value))
+        while len(_response_cache) > CACHE_MAX_ENTRIES:
+            del _response_cache[next(iter(_response_cache))]
+
+
+def ranking_cache_key(topic_name, exam_name, videos):
+    """Cache key for a ranking: the topic, the exam and the set of candidate videos"""
+    return ('rank', topic_name, exam_name, tuple(sorted(v['video_id'] for v in videos)))
+
+
+# Generated plans live server-side; the session cookie only carries a short
+# plan id instead of the whole plan (which it would sign on every request)
+PLAN_STORE_MAX = 1000
+_plans = {}
+_plans_lock = threading.Lock()
 
-        # If the module exposes generate_text
-        if hasattr(genai, 'generate_text'):
+
+def save_plan(study_plan):
+    """Store a study plan and return the id to keep in the session"""
+    plan_id = secrets.token_urlsafe(16)
+    with _plans_lock:
+        _plans[plan_id] = study_plan
+        while len(_plans) > PLAN_STORE_MAX:
+            del _plans[next(iter(_plans))]
+    return plan_id
+
+
+def get_plan(plan_id):
+    """Look up a stored study plan, or None if unknown/expired"""
+    if not plan_id:
+        return None
+    with _plans_lock:
+        return _plans.get(plan_id)
+
+
+def session_topics():
+    """Topics of the study plan attached to the current session, if any"""
+    plan = get_plan(session.get('plan_id'))
+    return plan.get('topics') if plan else None
+
+
+# Max topics ranked together in one Gemini call; bigger prompts stop paying off
+RANK_BATCH_SIZE = 5
+
+
+def _response_text(resp):
+    """Pull the text out of whatever the GenAI client returned"""
+    if isinstance(resp, str):
+        return resp
+    if isinstance(resp, dict):
+        return resp.get('text') or resp.get('content') or resp.get('output')
+    return getattr(resp, 'text', None)
+
+
+def _pick_backend():
+    """Work out once which way the installed GenAI client can be called; None if none fits"""
+    # If the model object exposes generate_content (original code expectation)
+    if hasattr(model, 'generate_content'):
+        def generate_content(prompt, config=None):
+            return model.generate_content(prompt, generation_config=config)
+        return generate_content
+
+    # Older module-level functions below have no structured output, so config is ignored
+
+    # If the genai module exposes a generate(...) function returning dict/object
+    if hasattr(genai, 'generate'):
+        def generate(prompt, config=None):
             try:
-                # try to pass model info if available
-                model_name = model if isinstance(model, str) else getattr(model, 'name', None)
-                resp = genai.generate_text(prompt=prompt, model=model_name) if model_name else genai.generate_text(prompt=prompt)
-            except Exception:
-                resp = genai.generate_text(prompt=prompt)
+                return genai.generate(prompt=prompt)
+            except TypeError:
+                # older signatures might accept positional
+                return genai.generate(prompt)
+        return generate
 
-            text = getattr(resp, 'text', None)
-            if text is None and isinstance(resp, dict):
-                text = resp.get('text')
-            return text.strip() if isinstance(text, str) else None
+    # If the module exposes generate_text, passing model info if available
+    if hasattr(genai, 'generate_text'):
+        model_name = model if isinstance(model, str) else getattr(model, 'name', None)
 
-        # Last resort: if model is a string name, try passing it to genai.generate
-        if isinstance(model, str) and hasattr(genai, 'generate'):
+        def generate_text(prompt, config=None):
             try:
-                resp = genai.generate(model=model, prompt=prompt)
-                if isinstance(resp, dict):
-                    text = resp.get('text') or resp.get('content')
-                else:
-                    text = getattr(resp, 'text', None)
-                return text.strip() if isinstance(text, str) else None
+                return genai.generate_text(prompt=prompt, model=model_name) if model_name else genai.generate_text(prompt=prompt)
             except Exception:
-                pass
-
-        print('DEBUG: no compatible genai method found; model type:', type(model))
+                return genai.generate_text(prompt=prompt)
+        return generate_text
+
+    return None
+
+
+_generate = _pick_backend()
+
+
+def _pick_stream_backend():
+    """Streaming counterpart of _pick_backend(); None if the client can't stream"""
+    if hasattr(model, 'generate_content'):
+        def generate_content_stream(prompt, config=None):
+            return model.generate_content(prompt, generation_config=config, stream=True)
+        return generate_content_stream
+
+    return None
+
+
+_stream = _pick_stream_backend()
+
+
+# Response schemas: Gemini's JSON mode constrains replies to these shapes,
+# so the prompts don't need to spell out the format and no cleanup is needed.
+# The model can still leave out fields, so replies are checked before caching.
+# Plain dicts (rather than TypedDicts) work on every Python version and are
+# accepted by both google-generativeai and the google-genai Batch API.
+STRING_LIST_SCHEMA = {'type': 'ARRAY', 'items': {'type': 'STRING'}}
+
+STUDY_PLAN_SCHEMA = {
+    'type': 'OBJECT',
+    'properties': {
+        'topics': {
+            'type': 'ARRAY',
+            'items': {
+                'type': 'OBJECT',
+                'properties': {
+                    'name': {'type': 'STRING'},
+                    'weightage': {'type': 'STRING'},
+                    'estimated_hours': {'type': 'INTEGER'},
+                    'key_concepts': STRING_LIST_SCHEMA,
+                    'search_queries': STRING_LIST_SCHEMA,
+                },
+                'required': ['name', 'weightage'],
+            },
+        },
+    },
+    'required': ['topics'],
+}
+
+RANKED_VIDEOS_SCHEMA = {
+    'type': 'ARRAY',
+    'items': {
+        'type': 'OBJECT',
+        'properties': {
+            'video_id': {'type': 'STRING'},
+            'rank': {'type': 'INTEGER'},
+            'reasoning': {'type': 'STRING'},
+        },
+        'required': ['video_id', 'rank'],
+    },
+}
+
+RANKING_SCHEMA = {
+    'type': 'OBJECT',
+    'properties': {'ranked_videos': RANKED_VIDEOS_SCHEMA},
+}
+
+BATCH_RANKING_SCHEMA = {
+    'type': 'OBJECT',
+    'properties': {
+        'rankings': {
+            'type': 'ARRAY',
+            'items': {
+                'type': 'OBJECT',
+                'properties': {
+                    'topic': {'type': 'STRING'},
+                    'ranked_videos': RANKED_VIDEOS_SCHEMA,
+                },
+                'required': ['topic', 'ranked_videos'],
+            },
+        },
+    },
+}
+
+
+def json_config(schema):
+    """Generation config asking Gemini for JSON matching schema"""
+    return genai.types.GenerationConfig(response_mime_type='application/json', response_schema=schema)
+
+
+STUDY_PLAN_CONFIG = json_config(STUDY_PLAN_SCHEMA)
+RANKING_CONFIG = json_config(RANKING_SCHEMA)
+BATCH_RANKING_CONFIG = json_config(BATCH_RANKING_SCHEMA)
+
+
+def call_model(prompt, config=None):
+    """Call the GenAI backend picked at import time and return text or None."""
+    if _generate is None:
+        logger.warning('⚠️ No compatible GenAI method found; model type: %s', type(model))
         return None
 
+    try:
+        text = _response_text(_generate(prompt, config))
+        return text.strip() if isinstance(text, str) else None
+
     except Exception as e:
-        print('DEBUG: call_model exception:', e)
+        logger.warning('⚠️ Gemini call failed: %s', e, exc_info=True)
         return None
 
-def print_header(text):
-    """Print a nice header"""
-    print("\n" + "="*60)
-    print(f"  {text}")
-    print("="*60 + "\n")
-
 
-def generate_study_plan(exam_name, semester, university, exam_date):
-    """Generate study plan using Gemini"""
-    
-    print("🤖 Asking Gemini AI to generate study plan...")
-    
-    prompt = f"""You are an education expert.
+def stream_model(prompt, config=None):
+    """Yield the model's reply as it is generated (one chunk if the client can't stream)"""
+    if _stream is None:
+        text = call_model(prompt, config)
+        if text:
+            yield text
+        return
 
-Create a study plan for:
+    try:
+        for chunk in _stream(prompt, config):
+            text = getattr(chunk, 'text', None)
+            if text:
+                yield text
+    except Exception as e:
+        logger.warning('⚠️ Gemini streaming call failed: %s', e, exc_info=True)
+
+
+class TopicStreamParser:
+    """Pull complete entries out of the "topics" array of a JSON reply as it streams in"""
+
+    def __init__(self):
+        self.buffer = ''
+        self.pos = None         # next character to scan, once inside the array
+        self.depth = 0          # object nesting level inside the array
+        self.start = 0          # where the current topic object begins
+        self.in_string = False
+        self.escaped = False
+        self.done = False
+
+    def feed(self, chunk):
+        """Add a chunk of text and return the topics completed by it"""
+        self.buffer += chunk
+        found = []
+
+        if self.pos is None:
+            key = self.buffer.find('"topics"')
+            bracket = self.buffer.find('[', key) if key != -1 else -1
+            if bracket == -1:
+                return found
+            self.pos = bracket + 1
+
+        buf = self.buffer
+        i = self.pos
+        while i < len(buf) and not self.done:
+            ch = buf[i]
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == '\\':
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = True
+            elif ch == '{':
+                if self.depth == 0:
+                    self.start = i
+                self.depth += 1
+            elif ch == '}':
+                self.depth -= 1
+                if self.depth == 0:
+                    try:
+                        found.append(orjson.loads(buf[self.start:i + 1]))
+                    except orjson.JSONDecodeError:
+                        pass
+            elif ch == ']' and self.depth == 0:
+                self.done = True
+            i += 1
+        self.pos = i
+        return found
+
+
+def log_header(text):
+    """Log a nice header"""
+    logger.info("\n%s\n  %s\n%s", "="*60, text, "="*60)
+
+
+def study_plan_prompt(exam_name, semester, university, exam_date):
+    """Prompt asking Gemini for a study plan"""
+    return f"""Create a study plan for:
 Exam: {exam_name}
 Level: {semester}
 Board: {university}
@@ -121,37 +442,45 @@ For each topic include:
 - weightage (HIGH/MEDIUM/LOW)
 - estimated_hours
 - 3 key concepts
+- 2 YouTube search queries that would find the best tutorials for it"""
 
-Return ONLY valid JSON in this format:
-{{
-  "topics": [{{
-      "name": "",
-      "weightage": "",
-      "estimated_hours": 0,
-      "key_concepts": ["", "", ""]}}
-  ]
-}}"""
 
+def generate_study_plan(exam_name, semester, university, exam_date):
+    """Generate study plan using Gemini"""
+    
+    cache_key = ('plan', exam_name, semester, university, exam_date)
+    cached = cache_get(cache_key)
+    if cached:
+        logger.info("♻️ Using cached study plan")
+        return cached
+
+    logger.info("🤖 Asking Gemini AI to generate study plan...")
+    
+    prompt = study_plan_prompt(exam_name, semester, university, exam_date)
     
     try:
-        text = call_model(prompt)
+        # Stream the reply and start the YouTube search for the first few topics
+        # as soon as each is complete, while the model is still writing the rest.
+        # Results land in the cache, ready for the dashboard and video pages.
+        parser = TopicStreamParser()
+        chunks = []
+        prefetched = 0
+        for chunk in stream_model(prompt, STUDY_PLAN_CONFIG):
+            chunks.append(chunk)
+            for topic in parser.feed(chunk):
+                if prefetched < PREFETCH_TOPICS and isinstance(topic, dict) and topic.get('name'):
+                    prefetch_executor.submit(search_youtube, topic['name'], exam_name, topic_search_query(topic))
+                    prefetched += 1
+        text = ''.join(chunks).strip()
 
         if text:
-            # Clean markdown
-            if text.startswith('```json'):
-                text = text[7:]
-            if text.startswith('```'):
-                text = text[3:]
-            if text.endswith('```'):
-                text = text[:-3]
-            text = text.strip()
-
-            plan = json.loads(text)
-            print(f"✅ Generated {len(plan['topics'])} topics\n")
+            plan = orjson.loads(text)
+            logger.info("✅ Generated %s topics", len(plan['topics']))
+            cache_set(cache_key, plan)
             return plan
 
         # If AI didn't return valid text, fallback
-        print('⚠️ AI backend unavailable or returned no text — falling back to static plan')
+        logger.warning('⚠️ AI backend unavailable or returned no text — falling back to static plan')
         fallback = {
             'topics': [
                 {'name': 'Important Topic 1', 'weightage': 'HIGH', 'estimated_hours': 12, 'key_concepts': ['Concept A','Concept B','Concept C']},
@@ -164,16 +493,22 @@ Return ONLY valid JSON in this format:
         return fallback
 
     except Exception as e:
-        print(f"❌ Error while generating study plan: {e}")
+        logger.error("❌ Error while generating study plan: %s", e)
         return None
 
 
-def search_youtube(topic_name, exam_name):
-    """Search YouTube for videos"""
+def search_youtube(topic_name, exam_name, query=None):
+    """Search YouTube for videos, preferring the AI-suggested query if given"""
     
-    print(f"🔍 Searching YouTube for: {topic_name}")
+    logger.info("🔍 Searching YouTube for: %s", topic_name)
     
-    query = f"{topic_name} {exam_name} tutorial"
+    query = query or f"{topic_name} {exam_name} tutorial"
+    cache_key = ('youtube', query)
+    cached = cache_get(cache_key)
+    if cached:
+        logger.info("♻️ Using cached search results")
+        return cached
+
     url = "https://www.googleapis.com/youtube/v3/search"
     
     params = {
@@ -181,13 +516,15 @@ def search_youtube(topic_name, exam_name):
         'q': query,
         'type': 'video',
         'maxResults': 10,
-        'videoDuration': 'medium',
         'order': 'relevance',
+        'safeSearch': 'moderate',
+        # Partial response: only the fields we actually read below
+        'fields': 'items(id/videoId,snippet(title,channelTitle))',
         'key': YOUTUBE_API_KEY
     }
     
     try:
-        response = requests.get(url, params=params)
+        response = http.get(url, params=params, timeout=(3, 10))
         data = response.json()
         
         videos = []
@@ -199,229 +536,474 @@ def search_youtube(topic_name, exam_name):
                 'url': f"https://www.youtube.com/watch?v={item['id']['videoId']}"
             })
         
-        print(f"✅ Found {len(videos)} videos\n")
+        logger.info("✅ Found %s videos", len(videos))
+        if videos:
+            cache_set(cache_key, videos)
         return videos
         
     except Exception as e:
-        print(f"❌ Error: {e}\n")
+        logger.error("❌ Error: %s", e)
         return []
 
 
+def valid_ranked(ranked):
+    """Drop ranking entries missing a video id or rank"""
+    return [r for r in ranked if isinstance(r, dict) and r.get('video_id') and r.get('rank') is not None]
+
+
 def rank_videos(topic_name, exam_name, videos):
     """Rank videos using Gemini"""
     
     if not videos:
         return []
     
-    print(f"🤖 Ranking videos with Gemini AI...")
+    cache_key = ranking_cache_key(topic_name, exam_name, videos)
+    cached = cache_get(cache_key)
+    if cached:
+        logger.info("♻️ Using cached video ranking")
+        return cached
+
+    logger.info("🤖 Ranking videos with Gemini AI...")
     
     prompt = f"""Rank YouTube videos for topic "{topic_name}" and exam "{exam_name}".
 
 Videos:
-{json.dumps(videos)}
+{orjson.dumps(videos).decode()}
 
-Pick TOP 5.
-
-Return ONLY valid JSON:
-{{
-  "ranked_videos": [
-    {{
-      "video_id": "",
-      "rank": 1,
-      "reasoning": ""
-    }}
-  ]
-}}"""
+Pick TOP 5, each with a short reasoning."""
 
     
     try:
-        text = call_model(prompt)
+        text = call_model(prompt, RANKING_CONFIG)
 
         if text:
-            print('DEBUG: raw ranking output from model:\n', text)
-            # Clean markdown
-            if text.startswith('```json'):
-                text = text[7:]
-            if text.startswith('```'):
-                text = text[3:]
-            if text.endswith('```'):
-                text = text[:-3]
-            text = text.strip()
-
-            # Try to extract JSON object/array embedded in the response
-            import re
-            json_text = None
-            # look for a JSON object
-            m_obj = re.search(r"\{[\s\S]*\}", text)
-            m_arr = re.search(r"\[[\s\S]*\]", text)
-            if m_obj:
-                json_text = m_obj.group(0)
-            elif m_arr:
-                json_text = m_arr.group(0)
-
-            if json_text:
-                try:
-                    result = json.loads(json_text)
-                    ranked = result.get('ranked_videos', []) if isinstance(result, dict) else result
-                    print(f"✅ Ranked {len(ranked)} videos (parsed JSON)\n")
-                    return ranked[:5]
-                except Exception as e:
-                    print('DEBUG: failed to parse extracted JSON:', e)
-
-            # If JSON parsing failed, attempt heuristic: match video_ids in the raw text
-            # and order by their first occurrence index
-            id_positions = []
-            for v in videos:
-                vid = v.get('video_id')
-                if not vid:
-                    continue
-                pos = text.find(vid)
-                if pos != -1:
-                    # try to extract a short reasoning near the id (few chars around)
-                    start = max(0, pos - 120)
-                    end = min(len(text), pos + 200)
-                    reasoning = text[start:end].strip()
-                    id_positions.append((vid, pos, reasoning))
-
-            if id_positions:
-                # sort by position (earlier means higher rank)
-                id_positions.sort(key=lambda x: x[1])
-                ranked = []
-                for i, (vid, pos, reasoning) in enumerate(id_positions[:5]):
-                    ranked.append({'video_id': vid, 'rank': i+1, 'reasoning': reasoning})
-                print(f"✅ Ranked {len(ranked)} videos (heuristic by id match)\n")
+            logger.debug('raw ranking output from model:\n%s', text)
+            ranked = valid_ranked(orjson.loads(text).get('ranked_videos', []))[:5]
+            if ranked:
+                logger.info("✅ Ranked %s videos", len(ranked))
+                cache_set(cache_key, ranked)
                 return ranked
 
-            # else fall through to fallback
-
-        print(f"⚠️ Ranking failed or AI returned no text, using first 5 videos\n")
+        logger.warning("⚠️ Ranking failed or AI returned no text, using first 5 videos")
         return [{'video_id': v['video_id'], 'rank': i+1} for i, v in enumerate(videos[:5])]
 
     except Exception as e:
-        print(f"⚠️ Ranking failed with exception: {e} — using first 5 videos\n")
+        logger.warning("⚠️ Ranking failed with exception: %s — using first 5 videos", e)
         return [{'video_id': v['video_id'], 'rank': i+1} for i, v in enumerate(videos[:5])]
 
 
+def rank_videos_batch(exam_name, topics_and_videos):
+    """Rank videos for several topics with a single Gemini call
+
+    Takes a list of (topic_name, videos) tuples and returns a list of rankings
+    in the same order. Topics the model leaves out (or a response that can't
+    be parsed) fall back to a per-topic rank_videos() call.
+    """
+
+    # Serve what we can from the cache; only the rest goes to the model
+    rankings = {}
+    pending = {}
+    for name, videos in topics_and_videos:
+        if not videos:
+            continue
+        cached = cache_get(ranking_cache_key(name, exam_name, videos))
+        if cached:
+            rankings[name] = cached
+        else:
+            pending[name] = videos
+
+    if pending:
+        rankings.update(_rank_pending_topics(exam_name, pending))
+
+    results = []
+    for name, videos in topics_and_videos:
+        if not videos:
+            results.append([])
+        elif rankings.get(name):
+            results.append(rankings[name])
+        else:
+            results.append(rank_videos(name, exam_name, videos))
+    return results
+
+
+def _rank_pending_topics(exam_name, pending):
+    """Single Gemini ranking call for {topic_name: videos}; returns {topic_name: ranked}"""
+
+    logger.info("🤖 Ranking videos for %s topics with Gemini AI...", len(pending))
+
+    prompt = f"""Rank YouTube videos for each topic of the exam "{exam_name}".
+
+Topics and their videos:
+{orjson.dumps([{'topic': name, 'videos': videos} for name, videos in pending.items()]).decode()}
+
+For EACH topic pick its TOP 5 videos, each with a short reasoning.
+Use the topic names exactly as given."""
+
+    rankings = {}
+    try:
+        text = call_model(prompt, BATCH_RANKING_CONFIG)
+
+        if text:
+            result = orjson.loads(text)
+            for entry in result.get('rankings', []):
+                name = entry.get('topic')
+                ranked = valid_ranked(entry.get('ranked_videos', []))[:5]
+                if name in pending and ranked:
+                    rankings[name] = ranked
+                    cache_set(ranking_cache_key(name, exam_name, pending[name]), ranked)
+            logger.info("✅ Ranked videos for %s topics in one call", len(rankings))
+
+    except Exception as e:
+        logger.warning("⚠️ Batch ranking failed: %s — ranking topics one by one", e)
+
+    return rankings
+
+
+# Sort order for topic weightage (HIGH first)
+WEIGHT_ORDER = {'HIGH': 0, 'MEDIUM': 1, 'LOW': 2}
+
+
+def normalize_topics(topics):
+    """Normalize topic keys (handle variations from AI output) and sort by weightage"""
+    normalized = []
+    for t in topics:
+        name = t.get('name') or t.get('topic') or t.get('title') or ''
+        weight = (t.get('weightage') or t.get('weight') or t.get('priority') or '').upper()
+        if weight not in ('HIGH', 'MEDIUM', 'LOW'):
+            # try to detect from text
+            if 'high' in weight.lower():
+                weight = 'HIGH'
+            elif 'med' in weight.lower():
+                weight = 'MEDIUM'
+            elif 'low' in weight.lower():
+                weight = 'LOW'
+            else:
+                weight = 'MEDIUM'
+
+        est = t.get('estimated_hours') if t.get('estimated_hours') is not None else t.get('estimatedHours') if t.get('estimatedHours') is not None else t.get('hours') if t.get('hours') is not None else ''
+        key_concepts = t.get('key_concepts') or t.get('keyConcepts') or t.get('concepts') or []
+        # Ensure list
+        if not isinstance(key_concepts, list):
+            try:
+                key_concepts = list(key_concepts)
+            except Exception:
+                key_concepts = [str(key_concepts)]
+
+        normalized.append({
+            'name': name,
+            'weightage': weight,
+            'estimated_hours': est,
+            'key_concepts': key_concepts,
+            'search_queries': t.get('search_queries') or []
+        })
+
+    # Sort by weightage (HIGH -> MEDIUM -> LOW)
+    normalized.sort(key=lambda x: WEIGHT_ORDER[x['weightage']])
+    return normalized
+
+
+def topic_search_query(topic):
+    """First search query suggested for a topic in the study plan, if any"""
+    queries = topic.get('search_queries') or []
+    return queries[0] if queries else None
+
+
+def _merge_ranked(videos, ranked):
+    """Full video entries in ranked order, with each ranking's rank and reasoning attached"""
+    by_id = {v['video_id']: v for v in videos}
+    # Rankings from older cache entries or the model may lack a rank; fall back to position
+    return [{**by_id[r['video_id']], 'rank': r.get('rank', i + 1), 'reasoning': r.get('reasoning', '')}
+            for i, r in enumerate(ranked) if r.get('video_id') in by_id]
+
+
+def attach_videos(topics, exam_name):
+    """Search YouTube for every topic and attach the ranked videos"""
+
+    # Start every YouTube search up front; they are independent
+    searches = [executor.submit(search_youtube, t['name'], exam_name, topic_search_query(t)) for t in topics]
+
+    # Rank in small batches: one Gemini call covers up to RANK_BATCH_SIZE topics.
+    # Each batch's ranking is handed to the pool as soon as its searches are in,
+    # so Gemini ranks batch N while YouTube is still answering batch N+1.
+    pipeline = []
+    for start in range(0, len(topics), RANK_BATCH_SIZE):
+        batch = [(topic, search.result()) for topic, search in zip(topics[start:start + RANK_BATCH_SIZE], searches[start:start + RANK_BATCH_SIZE])]
+        ranking = executor.submit(rank_videos_batch, exam_name, [(topic['name'], videos) for topic, videos in batch])
+        pipeline.append((batch, ranking))
+
+    for batch, ranking in pipeline:
+        rankings = ranking.result()
+
+        # Merge data
+        for (topic, videos), ranked in zip(batch, rankings):
+            topic['videos'] = _merge_ranked(videos, ranked)
+
+    return topics
+
+
 def display_study_plan(exam_name, semester, university, exam_date, topics):
-    """Display the study plan nicely"""
+    """Log the study plan nicely"""
     
-    print_header("📚 YOUR PERSONALIZED STUDY PLAN")
+    # Building the report is pointless when INFO output is muted
+    if not logger.isEnabledFor(logging.INFO):
+        return
+
+    log_header("📚 YOUR PERSONALIZED STUDY PLAN")
     
-    print(f"📖 Exam: {exam_name}")
-    print(f"📅 Semester: {semester}")
-    print(f"🏫 University: {university}")
-    print(f"📆 Exam Date: {exam_date}")
+    lines = [
+        f"📖 Exam: {exam_name}",
+        f"📅 Semester: {semester}",
+        f"🏫 University: {university}",
+        f"📆 Exam Date: {exam_date}",
+    ]
+    logger.info("\n".join(lines))
     
-    print_header(f"📋 {len(topics)} TOPICS TO STUDY")
+    log_header(f"📋 {len(topics)} TOPICS TO STUDY")
     
     for i, topic in enumerate(topics, 1):
-        print(f"\n{'='*60}")
-        print(f"Topic {i}: {topic['name']}")
-        print(f"{'='*60}")
-        
-        # Topic details
-        print(f"⚡ Priority: {topic['weightage']}")
-        print(f"⏱️  Estimated Hours: {topic['estimated_hours']}")
-        
-        # Key concepts
-        print(f"\n🎯 Key Concepts:")
+        lines = [
+            f"\n{'='*60}",
+            f"Topic {i}: {topic['name']}",
+            f"{'='*60}",
+            # Topic details
+            f"⚡ Priority: {topic['weightage']}",
+            f"⏱️  Estimated Hours: {topic['estimated_hours']}",
+            # Key concepts
+            "\n🎯 Key Concepts:",
+        ]
         for concept in topic['key_concepts']:
-            print(f"   • {concept}")
+            lines.append(f"   • {concept}")
         
         # Videos
         if 'videos' in topic and topic['videos']:
-            print(f"\n🎥 Recommended Videos ({len(topic['videos'])}):")
+            lines.append(f"\n🎥 Recommended Videos ({len(topic['videos'])}):")
             for video in topic['videos']:
-                print(f"\n   #{video['rank']} - {video['title']}")
-                print(f"       📺 {video['channel']}")
-                print(f"       🔗 {video['url']}")
+                lines.append(f"\n   #{video['rank']} - {video['title']}")
+                lines.append(f"       📺 {video['channel']}")
+                lines.append(f"       🔗 {video['url']}")
                 if 'reasoning' in video:
-                    print(f"       💡 {video['reasoning']}")
+                    lines.append(f"       💡 {video['reasoning']}")
         else:
-            print(f"\n🎥 No videos found for this topic")
+            lines.append("\n🎥 No videos found for this topic")
+
+        logger.info("\n".join(lines))
 
 
 def main():
     """Main function"""
     
-    print_header("🎓 AI-POWERED STUDY PLANNER")
+    log_header("🎓 AI-POWERED STUDY PLANNER")
     
     # Get user input
-    print("Let's create your personalized study plan!\n")
+    logger.info("Let's create your personalized study plan!")
     
     exam_name = session.get("exam_name")
     semester = session.get("semester")
     university = session.get("university")
     exam_date = session.get("exam_date")
     
-    print(f"Exam: {exam_name}")
-    print(f"Semester: {semester}")
-    print(f"University: {university}")
-    print(f"Exam Date: {exam_date}\n")
+    logger.info("Exam: %s | Semester: %s | University: %s | Exam Date: %s", exam_name, semester, university, exam_date)
     if not all([exam_name, semester, university, exam_date]):
-        print(exam_name, semester, university, exam_date,"hello")
+        logger.debug("missing exam details: %s %s %s %s", exam_name, semester, university, exam_date)
         return
     
     # Generate study plan
-    print_header("GENERATING STUDY PLAN")
+    log_header("GENERATING STUDY PLAN")
     study_plan = generate_study_plan(exam_name, semester, university, exam_date)
     
     if not study_plan or not study_plan.get('topics'):
-        print("❌ Failed to generate study plan")
+        logger.error("❌ Failed to generate study plan")
         return
     
-    # Process each topic (limit to 5 for demo)
-    topics_with_videos = []
-    
-    for topic in study_plan['topics'][:5]:
-        print(f"\n{'─'*60}")
-        print(f"Processing: {topic['name']}")
-        print(f"{'─'*60}")
-        
-        # Search YouTube
-        videos = search_youtube(topic['name'], exam_name)
-        
-        # Rank with Gemini
-        ranked = rank_videos(topic['name'], exam_name, videos)
-        
-        # Merge data
-        topic['videos'] = []
-        for ranked_video in ranked:
-            full_video = next((v for v in videos if v['video_id'] == ranked_video['video_id']), None)
-            if full_video:
-                full_video['rank'] = ranked_video['rank']
-                full_video['reasoning'] = ranked_video.get('reasoning', '')
-                topic['videos'].append(full_video)
-        
-        topics_with_videos.append(topic)
+    # Process each topic (limit to 5 for demo): concurrent YouTube searches,
+    # then a single batched Gemini ranking call
+    topics_with_videos = attach_videos(study_plan['topics'][:5], exam_name)
     
     # Display final result
     display_study_plan(exam_name, semester, university, exam_date, topics_with_videos)
     
-    print_header("✅ STUDY PLAN GENERATED SUCCESSFULLY")
-    print("Good luck with your exam preparation! 🎯\n")
+    log_header("✅ STUDY PLAN GENERATED SUCCESSFULLY")
+    logger.info("Good luck with your exam preparation! 🎯")
     return topics_with_videos
 
+# Batch mode: /Submit requests are queued for a short window and sent to
+# Gemini's Batch API together, which costs half as much as individual calls
+# but takes longer. Opt in with GEMINI_BATCH_MODE=1; students who tick
+# "urgent" on the form still get a synchronous plan.
+BATCH_MODE = os.getenv('GEMINI_BATCH_MODE') == '1'
+BATCH_WINDOW = 30       # seconds to collect submissions before sending a batch
+BATCH_MAX_SIZE = 20     # send early once this many submissions are waiting
+BATCH_MAX_WAIT = 10 * 60  # give up on a batch job after this many seconds
+# Only these states mean "keep polling"; anything else (including states the
+# SDK doesn't map, e.g. BATCH_STATE_EXPIRED) is treated as finished
+BATCH_RUNNING_STATES = (
+    'JOB_STATE_UNSPECIFIED', 'JOB_STATE_QUEUED', 'JOB_STATE_PENDING', 'JOB_STATE_RUNNING',
+    'JOB_STATE_UPDATING', 'JOB_STATE_PAUSED',
+    'BATCH_STATE_PENDING', 'BATCH_STATE_RUNNING',
+)
+BATCH_SUCCESS_STATES = ('JOB_STATE_SUCCEEDED', 'JOB_STATE_PARTIALLY_SUCCEEDED')
+JOB_STORE_MAX = 1000
+
+def _job_state(job):
+    """Name of a batch job's state, whether or not the SDK mapped it to JobState"""
+    return getattr(job.state, 'name', None) or str(job.state)
+
+
+class StudyPlanBatcher:
+    """Queues study-plan requests and sends them to Gemini's Batch API together"""
+
+    def __init__(self, window=BATCH_WINDOW, max_size=BATCH_MAX_SIZE):
+        self.window = window
+        self.max_size = max_size
+        self.queue = deque()
+        self.jobs = {}          # job id -> {'status': 'pending'|'done'|'failed', 'plan_id': ...}
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.thread = None
+
+    def submit(self, exam_name, semester, university, exam_date):
+        """Queue a study-plan request and return its job id"""
+        job_id = uuid.uuid4().hex
+        with self.lock:
+            self.jobs[job_id] = {'status': 'pending', 'plan_id': None}
+            while len(self.jobs) > JOB_STORE_MAX:
+                del self.jobs[next(iter(self.jobs))]
+            self.queue.append((job_id, (exam_name, semester, university, exam_date)))
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, daemon=True)
+                self.thread.start()
+            if len(self.queue) >= self.max_size:
+                self.wakeup.set()
+        return job_id
+
+    def status(self, job_id):
+        """Current status of a job, or None if unknown"""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def _run(self):
+        """Flush the queue every window (or as soon as it fills up)"""
+        while True:
+            self.wakeup.wait(self.window)
+            self.wakeup.clear()
+            with self.lock:
+                batch = [self.queue.popleft() for _ in range(min(len(self.queue), self.max_size))]
+            if batch:
+                # Polling a batch job can take minutes, so each gets its own thread
+                threading.Thread(target=self._process, args=(batch,), daemon=True).start()
+
+    def _process(self, batch):
+        """Send one batch, wait for it with exponential backoff and store the plans"""
+        logger.info("📦 Sending %s study plan requests to the Gemini Batch API", len(batch))
+        responses = []
+        client = job = None
+        succeeded = False
+        try:
+            client = google_genai.Client(api_key=GEMINI_API_KEY)
+            job = client.batches.create(
+                model=MODEL_NAME,
+                src=[{
+                    'contents': [{'parts': [{'text': study_plan_prompt(*details)}], 'role': 'user'}],
+                    'config': {
+                        'system_instruction': SYSTEM_INSTRUCTION,
+                        'response_mime_type': 'application/json',
+                        'response_schema': STUDY_PLAN_SCHEMA,
+                    },
+                } for _, details in batch],
+                config={'display_name': f"exampill-study-plans-{int(time.time())}"},
+            )
+
+            delay = 5
+            deadline = time.monotonic() + BATCH_MAX_WAIT
+            state = _job_state(job)
+            while state in BATCH_RUNNING_STATES and time.monotonic() < deadline:
+                time.sleep(min(delay, max(0, deadline - time.monotonic())))
+                delay = min(delay * 2, 120)
+                job = client.batches.get(name=job.name)
+                state = _job_state(job)
+
+            if state in BATCH_SUCCESS_STATES and job.dest:
+                responses = job.dest.inlined_responses or []
+                succeeded = True
+            elif state in BATCH_RUNNING_STATES:
+                logger.error("❌ Batch job %s still %s after %ss, generating plans directly", job.name, state, BATCH_MAX_WAIT)
+            else:
+                logger.error("❌ Batch job %s ended in %s", job.name, state)
+
+        except Exception as e:
+            logger.error("❌ Batch study plan request failed: %s", e)
+
+        if job is not None and not succeeded:
+            # The plans are generated directly below, so don't leave the job
+            # queued or running (and billed) on Gemini's side
+            try:
+                client.batches.cancel(name=job.name)
+            except Exception as e:
+                logger.warning("⚠️ Failed to cancel batch job %s: %s", job.name, e)
+
+        for i, (job_id, details) in enumerate(batch):
+            plan = None
+            try:
+                if i < len(responses) and responses[i].response:
+                    plan = orjson.loads(responses[i].response.text)
+                    cache_set(('plan', *details), plan)
+            except Exception as e:
+                logger.warning('⚠️ Failed to parse batch response: %s', e)
+
+            if not plan or not plan.get('topics'):
+                # Don't leave the student waiting on a failed batch entry
+                plan = generate_study_plan(*details)
+            self._finish(job_id, plan)
+
+    def _finish(self, job_id, plan):
+        """Store a finished plan and mark its job done (or failed)"""
+        plan_id = None
+        if plan and plan.get('topics'):
+            plan['topics'] = normalize_topics(plan['topics'])
+            plan_id = save_plan(plan)
+        with self.lock:
+            if job_id in self.jobs:
+                self.jobs[job_id] = {'status': 'done' if plan_id else 'failed', 'plan_id': plan_id}
+
+
+batcher = StudyPlanBatcher()
+
+
 @app.route("/")
 def index():
     return render_template("index.html")
 
 @app.route("/Submit", methods=["POST"])
 def submit():
-    session["semester"] = request.form.get("semester")
-    session["exam_name"] = request.form.get("subject")
-    session["university"] = request.form.get("university")
-    session["exam_date"] = request.form.get("examDate")
-    print(session["semester"], session["exam_name"], session["university"], session["exam_date"])
+    semester = request.form.get("semester")
+    exam_name = request.form.get("subject")
+    university = request.form.get("university")
+    exam_date = request.form.get("examDate")
+    session["semester"] = semester
+    session["exam_name"] = exam_name
+    session["university"] = university
+    session["exam_date"] = exam_date
+    logger.debug("submission: %s %s %s %s", semester, exam_name, university, exam_date)
+
+    # In batch mode the plan is generated in the background; the dashboard
+    # waits for the job unless the student asked for it right away (or it's cached)
+    cached = cache_get(('plan', exam_name, semester, university, exam_date)) if BATCH_MODE else None
+    if BATCH_MODE and not request.form.get("urgent") and not cached:
+        job_id = batcher.submit(exam_name, semester, university, exam_date)
+        return redirect(url_for('dashboard', job=job_id))
 
     # Generate the study plan (topics only) and save to session
-    study_plan = generate_study_plan(session.get("exam_name"), session.get("semester"), session.get("university"), session.get("exam_date"))
+    study_plan = generate_study_plan(exam_name, semester, university, exam_date)
     if not study_plan or not study_plan.get('topics'):
         return render_template("result.html")
 
-    # Save topics (without videos) into session for later per-topic video lookup
-    session['study_plan'] = study_plan
-    session['topics'] = study_plan.get('topics')
+    # Normalize and sort the topics once, so every page and /videos/<idx> share
+    # the same order without redoing the work per request
+    study_plan['topics'] = normalize_topics(study_plan['topics'])
+
+    # Keep the plan (topics without videos) server-side for later per-topic video lookup
+    session['plan_id'] = save_plan(study_plan)
 
     # Redirect to dashboard so user sees the generated plan summary
     return redirect(url_for('dashboard'))
@@ -429,55 +1011,16 @@ def submit():
 
 @app.route('/topics')
 def topics_page():
-    topics = session.get('topics')
+    topics = session_topics()
     if not topics:
         return redirect(url_for('index'))
 
-    # Normalize topic keys (handle variations from AI output) and ensure consistent structure
-    normalized = []
-    for t in topics:
-        name = t.get('name') or t.get('topic') or t.get('title') or ''
-        weight = (t.get('weightage') or t.get('weight') or t.get('priority') or '').upper()
-        if weight not in ('HIGH', 'MEDIUM', 'LOW'):
-            # try to detect from text
-            if 'high' in weight.lower():
-                weight = 'HIGH'
-            elif 'med' in weight.lower():
-                weight = 'MEDIUM'
-            elif 'low' in weight.lower():
-                weight = 'LOW'
-            else:
-                weight = 'MEDIUM'
-
-        est = t.get('estimated_hours') if t.get('estimated_hours') is not None else t.get('estimatedHours') if t.get('estimatedHours') is not None else t.get('hours') if t.get('hours') is not None else ''
-        key_concepts = t.get('key_concepts') or t.get('keyConcepts') or t.get('concepts') or []
-        # Ensure list
-        if not isinstance(key_concepts, list):
-            try:
-                key_concepts = list(key_concepts)
-            except Exception:
-                key_concepts = [str(key_concepts)]
-
-        normalized.append({
-            'name': name,
-            'weightage': weight,
-            'estimated_hours': est,
-            'key_concepts': key_concepts
-        })
-
-    # Sort by weightage (HIGH -> MEDIUM -> LOW)
-    order = {'HIGH': 0, 'MEDIUM': 1, 'LOW': 2}
-    normalized.sort(key=lambda x: order.get(x.get('weightage', 'MEDIUM'), 1))
-
-    # Save normalized topics back to session so /videos/<idx> sees same order
-    session['topics'] = normalized
-
-    return render_template('topics.html', topics=normalized)
+    return render_template('topics.html', topics=topics)
 
 
 @app.route('/form')
 def form_page():
-    return render_template('form.html')
+    return render_template('form.html', batch_mode=BATCH_MODE)
 
 
 @app.route('/about')
@@ -492,38 +1035,76 @@ def faq_page():
 
 @app.route('/dashboard')
 def dashboard():
-    topics = session.get('topics')
+    job_id = request.args.get('job')
+    if job_id:
+        job = batcher.status(job_id)
+        if not job:
+            return redirect(url_for('index'))
+        if job['status'] == 'pending':
+            return render_template('pending.html', job_id=job_id)
+        if job['status'] == 'failed':
+            return render_template('result.html')
+        session['plan_id'] = job['plan_id']
+        return redirect(url_for('dashboard'))
+
+    topics = session_topics()
+    if not topics:
+        return redirect(url_for('index'))
+
+    exam_name = session.get('exam_name')
+    university = session.get('university')
+    exam_date = session.get('exam_date')
+    return render_template('dashboard.html', topics=topics, exam_name=exam_name, university=university, exam_date=exam_date)
+
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    job = batcher.status(job_id)
+    if not job:
+        return jsonify(status='unknown'), 404
+    return jsonify(status=job['status'])
+
+
+@app.route('/dashboard/top-videos')
+def top_topic_videos():
+    topics = session_topics()
     if not topics:
         return redirect(url_for('index'))
 
-    return render_template('dashboard.html', topics=topics, exam_name=session.get('exam_name'), university=session.get('university'), exam_date=session.get('exam_date'))
+    exam_name = session.get('exam_name')
+
+    # Only the highest-weighted topics, so a page view costs one ranking call and
+    # at most RANK_BATCH_SIZE YouTube searches (100 quota units each). Work on
+    # copies so the videos don't end up in the stored plan
+    topics = attach_videos([dict(t) for t in topics[:RANK_BATCH_SIZE]], exam_name)
+
+    return render_template('videos.html', topics=topics)
 
 
 @app.route('/videos/<int:idx>')
 def topic_videos(idx):
-    topics = session.get('topics')
+    topics = session_topics()
     if not topics:
         return redirect(url_for('index'))
 
     if idx < 0 or idx >= len(topics):
         return redirect(url_for('topics_page'))
 
-    topic = topics[idx]
+    topic = dict(topics[idx])
+    exam_name = session.get('exam_name')
 
     # Perform YouTube search and ranking for this single topic
-    videos = search_youtube(topic['name'], session.get('exam_name'))
-    ranked = rank_videos(topic['name'], session.get('exam_name'), videos)
+    videos = search_youtube(topic['name'], exam_name, topic_search_query(topic))
+    ranked = rank_videos(topic['name'], exam_name, videos)
 
     # Merge ranked metadata into full video entries
-    topic['videos'] = []
-    for ranked_video in ranked:
-        full_video = next((v for v in videos if v['video_id'] == ranked_video['video_id']), None)
-        if full_video:
-            full_video['rank'] = ranked_video['rank']
-            full_video['reasoning'] = ranked_video.get('reasoning', '')
-            topic['videos'].append(full_video)
+    topic['videos'] = _merge_ranked(videos, ranked)
 
     return render_template('videos.html', topics=[topic])
 
 if __name__ == '__main__':
+    # Under the reloader only the child process serves requests; gunicorn
+    # workers are warmed up from gunicorn.conf.py
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_warm_up()
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,7 @@
+# Picked up automatically by gunicorn from the working directory (see Procfile)
+
+
+def post_worker_init(worker):
+    """Warm up the Gemini and YouTube connections once the worker has loaded the app"""
+    from app import start_warm_up
+    start_warm_up()
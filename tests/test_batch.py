@@ -0,0 +1,62 @@
+from types import SimpleNamespace
+
+import app as exampill
+
+
+DETAILS = ('Operating Systems', 'Semester 4', 'Mumbai University', '2026-12-01')
+PLAN = {'topics': [{'name': 'Scheduling', 'weightage': 'HIGH', 'estimated_hours': 6, 'key_concepts': ['FCFS']}]}
+
+
+class FakeBatches:
+    def __init__(self, states):
+        self.states = list(states)
+        self.cancelled = []
+
+    def _job(self):
+        state = self.states.pop(0) if len(self.states) > 1 else self.states[0]
+        return SimpleNamespace(name='batches/1', state=SimpleNamespace(name=state), dest=None)
+
+    def create(self, **kwargs):
+        return self._job()
+
+    def get(self, name):
+        return self._job()
+
+    def cancel(self, name):
+        self.cancelled.append(name)
+
+
+def run_batch(monkeypatch, states):
+    batches = FakeBatches(states)
+    monkeypatch.setattr(exampill.google_genai, 'Client', lambda **kwargs: SimpleNamespace(batches=batches))
+    monkeypatch.setattr(exampill.time, 'sleep', lambda seconds: None)
+    monkeypatch.setattr(exampill, 'generate_study_plan', lambda *args: {'topics': [dict(t) for t in PLAN['topics']]})
+
+    batcher = exampill.StudyPlanBatcher()
+    batcher.jobs['job-1'] = {'status': 'pending', 'plan_id': None}
+    batcher._process([('job-1', DETAILS)])
+    return batcher, batches
+
+
+def test_unmapped_terminal_state_falls_back_to_direct_generation(monkeypatch):
+    batcher, batches = run_batch(monkeypatch, ['JOB_STATE_PENDING', 'BATCH_STATE_EXPIRED'])
+
+    job = batcher.status('job-1')
+    assert job['status'] == 'done'
+    assert exampill.get_plan(job['plan_id'])['topics'][0]['name'] == 'Scheduling'
+    assert batches.cancelled == ['batches/1']
+
+
+def test_paused_job_keeps_polling(monkeypatch):
+    _, batches = run_batch(monkeypatch, ['JOB_STATE_PAUSED', 'JOB_STATE_UPDATING', 'JOB_STATE_FAILED'])
+
+    assert batches.states == ['JOB_STATE_FAILED']
+    assert batches.cancelled == ['batches/1']
+
+
+def test_stuck_job_gives_up_after_max_wait(monkeypatch):
+    monkeypatch.setattr(exampill, 'BATCH_MAX_WAIT', 0)
+    batcher, batches = run_batch(monkeypatch, ['JOB_STATE_RUNNING'])
+
+    assert batcher.status('job-1')['status'] == 'done'
+    assert batches.cancelled == ['batches/1']
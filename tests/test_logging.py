@@ -0,0 +1,43 @@
+import logging
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import app as exampill
+
+
+def test_backend_failures_are_logged_at_warning(monkeypatch, caplog):
+    def broken(prompt, config=None):
+        raise RuntimeError('backend exploded')
+
+    monkeypatch.setattr(exampill, '_generate', broken)
+
+    with caplog.at_level(logging.INFO, logger='exampill'):
+        assert exampill.call_model('hello') is None
+
+    assert any(r.levelno == logging.WARNING and 'backend exploded' in r.getMessage() for r in caplog.records)
+
+
+def test_unknown_log_level_falls_back_to_info():
+    result = subprocess.run(
+        [sys.executable, '-c', 'import app; print(app.logger.level)'],
+        cwd=Path(__file__).resolve().parent.parent,
+        env={**os.environ, 'LOG_LEVEL': 'verbose'},
+        capture_output=True, text=True, check=True,
+    )
+
+    assert result.stdout.strip() == str(logging.INFO)
+    assert "Unknown LOG_LEVEL 'VERBOSE'" in result.stderr
+
+
+def test_stream_failures_are_logged_at_warning(monkeypatch, caplog):
+    def broken(prompt, config=None):
+        raise RuntimeError('stream exploded')
+
+    monkeypatch.setattr(exampill, '_stream', broken)
+
+    with caplog.at_level(logging.INFO, logger='exampill'):
+        assert list(exampill.stream_model('hello')) == []
+
+    assert any(r.levelno == logging.WARNING and 'stream exploded' in r.getMessage() for r in caplog.records)
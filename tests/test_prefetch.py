@@ -0,0 +1,18 @@
+import app as exampill
+
+
+def test_prefetch_is_limited_to_first_topics(monkeypatch):
+    topics = ','.join(f'{{"name": "Topic {i}", "weightage": "HIGH"}}' for i in range(8))
+    reply = f'{{"topics": [{topics}]}}'
+    searched = []
+
+    monkeypatch.setattr(exampill, 'stream_model', lambda prompt, config=None: iter([reply[:40], reply[40:]]))
+    monkeypatch.setattr(exampill, 'cache_get', lambda key: None)
+    monkeypatch.setattr(exampill, 'cache_set', lambda key, value: None)
+    monkeypatch.setattr(exampill.prefetch_executor, 'submit', lambda fn, *args: searched.append(args[0]))
+    monkeypatch.setattr(exampill, 'PREFETCH_TOPICS', 2)
+
+    plan = exampill.generate_study_plan('OS', 'Sem 4', 'MU', '2026-12-01')
+
+    assert len(plan['topics']) == 8
+    assert searched == ['Topic 0', 'Topic 1']
@@ -0,0 +1,26 @@
+from google.generativeai.types import generation_types
+
+import app as exampill
+
+
+def test_generation_configs_build_request_schemas():
+    # Converting the schema happens before any network call; it used to fail
+    # on Python < 3.12 when the schemas were typing.TypedDicts
+    for config in (exampill.STUDY_PLAN_CONFIG, exampill.RANKING_CONFIG, exampill.BATCH_RANKING_CONFIG):
+        converted = generation_types.to_generation_config_dict(config)
+        assert converted['response_mime_type'] == 'application/json'
+        assert converted['response_schema'].properties
+
+
+def test_ranking_entries_missing_required_fields_are_not_cached(monkeypatch):
+    reply = '{"ranked_videos": [{"video_id": "a", "rank": 1}, {"video_id": "b"}, {"rank": 3}]}'
+    cached = {}
+
+    monkeypatch.setattr(exampill, 'call_model', lambda prompt, config=None: reply)
+    monkeypatch.setattr(exampill, 'cache_get', lambda key: None)
+    monkeypatch.setattr(exampill, 'cache_set', cached.__setitem__)
+
+    ranked = exampill.rank_videos('Paging', 'OS', [{'video_id': 'a'}, {'video_id': 'b'}])
+
+    assert ranked == [{'video_id': 'a', 'rank': 1}]
+    assert list(cached.values()) == [ranked]
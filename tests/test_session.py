@@ -0,0 +1,47 @@
+import app as exampill
+
+
+PLAN = {
+    'topics': [
+        {'name': 'Scheduling', 'weightage': 'HIGH', 'estimated_hours': 6, 'key_concepts': ['FCFS', 'SJF', 'RR']},
+        {'name': 'Deadlocks', 'weightage': 'LOW', 'estimated_hours': 3, 'key_concepts': ['Banker', 'RAG', 'Avoidance']},
+    ]
+}
+
+
+def make_client():
+    exampill.app.config['TESTING'] = True
+    return exampill.app.test_client()
+
+
+def test_session_round_trip():
+    client = make_client()
+
+    with client.session_transaction() as sess:
+        sess['exam_name'] = 'Operating Systems'
+        sess['plan_id'] = 'abc123'
+
+    with client.session_transaction() as sess:
+        assert sess['exam_name'] == 'Operating Systems'
+        assert sess['plan_id'] == 'abc123'
+
+
+def test_submit_sets_session_and_reaches_dashboard(monkeypatch):
+    monkeypatch.setattr(exampill, 'generate_study_plan', lambda *args: {'topics': [dict(t) for t in PLAN['topics']]})
+    client = make_client()
+
+    response = client.post('/Submit', data={
+        'subject': 'Operating Systems',
+        'semester': 'Semester 4',
+        'university': 'Mumbai University',
+        'examDate': '2026-12-01',
+    })
+    assert response.status_code == 302
+    assert response.headers['Location'].endswith('/dashboard')
+
+    with client.session_transaction() as sess:
+        assert sess['exam_name'] == 'Operating Systems'
+        assert exampill.get_plan(sess['plan_id'])
+
+    assert client.get('/dashboard').status_code == 200
+    assert client.get('/topics').status_code == 200